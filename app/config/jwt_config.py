@@ -14,6 +14,7 @@ config.read('config.ini')
 JWT_SECRET_KEY = config['jwt']['secret_key']
 JWT_ALGORITHM = config['jwt']['algorithm']
 JWT_EXPIRE_MINUTES = int(config['jwt']['expire_minutes'])
+ADMIN_ROLE = "admin"
 
 security = HTTPBearer()
 
@@ -56,4 +57,10 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Security(securi
     except exceptions.PyJWTError as e:
         raise HTTPException(status_code=401, detail=f"Could not validate credentials: {str(e)}")
     except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
+
+def require_admin(current_user: dict = Depends(get_current_user)):
+    """Allow only tokens carrying the admin role"""
+    if current_user.get("role") != ADMIN_ROLE:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
@@ -4,6 +4,7 @@ import uuid
 from fastapi import Request
 from typing import Callable
 from contextvars import ContextVar
+from app.dependencies.profiling_middleware import timed
 
 # Create a context variable to store correlation ID
 correlation_id_ctx_var = ContextVar("correlation_id", default=None)
@@ -32,31 +33,33 @@ async def logging_dependency(request: Request, call_next: Callable):
     )
     
     # Log request with correlation ID
-    logger.info(
-        f"Request started - Method: {request.method} Path: {request.url.path}",
-        extra={
-            "correlation_id": correlation_id,
-            "port": service_port,
-            "method": request.method,
-            "path": request.url.path
-        }
-    )
-
-    try:
-        response = await call_next(request)
-        
-        process_time = (time.time() - start_time) * 1000
+    with timed("logging"):
         logger.info(
-            f"Request completed - Method: {request.method} Path: {request.url.path} Status: {response.status_code}",
+            f"Request started - Method: {request.method} Path: {request.url.path}",
             extra={
                 "correlation_id": correlation_id,
                 "port": service_port,
                 "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": f"{process_time:.2f}"
+                "path": request.url.path
             }
         )
+
+    try:
+        response = await call_next(request)
+        
+        process_time = (time.time() - start_time) * 1000
+        with timed("logging"):
+            logger.info(
+                f"Request completed - Method: {request.method} Path: {request.url.path} Status: {response.status_code}",
+                extra={
+                    "correlation_id": correlation_id,
+                    "port": service_port,
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status_code": response.status_code,
+                    "duration_ms": f"{process_time:.2f}"
+                }
+            )
         
         # Add correlation ID to response headers
         response.headers["X-Correlation-ID"] = correlation_id
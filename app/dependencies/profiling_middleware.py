@@ -0,0 +1,183 @@
+import time
+import asyncio
+import functools
+import cProfile
+import pstats
+import io
+import threading
+import configparser
+from contextlib import contextmanager
+from fastapi import Request, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Callable
+from contextvars import ContextVar
+from app.config.jwt_config import get_current_user, ADMIN_ROLE
+
+# Read config
+config = configparser.ConfigParser()
+config.read('config.ini')
+
+# Phase timings reveal how long internal dependencies take, so they are only
+# sent to everyone when explicitly enabled; profiled requests always get them
+SERVER_TIMING_ENABLED = config.getboolean('profiling', 'server_timing', fallback=False)
+
+# Per-request phase timings in ms, reported through the Server-Timing header
+server_timing_ctx_var = ContextVar("server_timing", default=None)
+# Set by TimedRoute so the wrapped endpoint can note when it returned
+endpoint_returned_ctx_var = ContextVar("endpoint_returned", default=None)
+
+# Held by a profiled request or by the sampling profiler while it runs; only
+# one profiling session may be active per worker at a time
+profiling_lock = threading.Lock()
+
+PROFILE_HEADER = "x-profile"
+SERVER_TIMING_PHASES = ("upstream", "upstream_decode", "serialization", "logging", "sqs")
+
+@contextmanager
+def timed(phase: str):
+    """Add the elapsed time of the wrapped block to the current request's phase"""
+    timings = server_timing_ctx_var.get()
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            elapsed = (time.perf_counter() - start_time) * 1000
+            timings[phase] = timings.get(phase, 0.0) + elapsed
+
+def _mark_endpoint_returned():
+    marker = endpoint_returned_ctx_var.get()
+    if marker is not None:
+        marker["returned_at"] = time.perf_counter()
+
+def _mark_on_return(endpoint: Callable) -> Callable:
+    # FastAPI inspects the endpoint's signature and whether it is a coroutine,
+    # so the wrapper keeps both
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            _mark_endpoint_returned()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            _mark_endpoint_returned()
+            return result
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """APIRoute that reports everything between the endpoint returning and the
+    response being ready (validation, jsonable_encoder and rendering) as the
+    serialization phase"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _mark_on_return(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request: Request):
+            # A mutable marker, so sync endpoints running in the threadpool
+            # with a copied context can still report back
+            marker = {}
+            token = endpoint_returned_ctx_var.set(marker)
+            try:
+                response = await route_handler(request)
+            finally:
+                endpoint_returned_ctx_var.reset(token)
+
+            timings = server_timing_ctx_var.get()
+            if timings is not None and "returned_at" in marker:
+                elapsed = (time.perf_counter() - marker["returned_at"]) * 1000
+                timings["serialization"] = timings.get("serialization", 0.0) + elapsed
+            return response
+
+        return timed_route_handler
+
+def format_server_timing(timings: dict, total_ms: float) -> str:
+    entries = [f"{phase};dur={timings.get(phase, 0.0):.2f}" for phase in SERVER_TIMING_PHASES]
+    entries.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(entries)
+
+def _is_profiling_authorized(request: Request) -> bool:
+    """Only admins may request a profile; reuses the regular JWT validation"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+
+    try:
+        current_user = get_current_user(
+            HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+        )
+    except HTTPException:
+        return False
+    return current_user.get("role") == ADMIN_ROLE
+
+async def _profile_request(request: Request, call_next: Callable):
+    if not profiling_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Another profiling session is already running")
+
+    try:
+        # cProfile hooks the event loop thread, so concurrent requests on the
+        # same worker can show up in the profile as well
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+ refuses to start while another tool holds the hook
+            raise HTTPException(status_code=409, detail=str(e))
+        try:
+            response = await call_next(request)
+            # Drain the body so streaming and serialization are profiled too
+            async for _ in response.body_iterator:
+                pass
+        finally:
+            profiler.disable()
+    finally:
+        profiling_lock.release()
+
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats("cumulative").print_stats(50)
+
+    # The profile replaces the body; the route's status is kept in a header
+    profile_response = PlainTextResponse(output.getvalue())
+    profile_response.headers["X-Profiled-Status"] = str(response.status_code)
+    if "x-correlation-id" in response.headers:
+        profile_response.headers["X-Correlation-ID"] = response.headers["x-correlation-id"]
+    return profile_response
+
+async def profiling_dependency(request: Request, call_next: Callable):
+    # The dict is shared with the inner middleware and route tasks, so phases
+    # recorded there are visible here once call_next returns
+    timings = {}
+    token = server_timing_ctx_var.set(timings)
+    start_time = time.perf_counter()
+
+    try:
+        # Without a valid admin token the header is ignored and the request
+        # is served as usual, so a stray X-Profile never breaks a client
+        if (
+            request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true")
+            and _is_profiling_authorized(request)
+        ):
+            try:
+                response = await _profile_request(request, call_next)
+            except HTTPException as e:
+                return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+
+            total_ms = (time.perf_counter() - start_time) * 1000
+            response.headers["Server-Timing"] = format_server_timing(timings, total_ms)
+            return response
+
+        response = await call_next(request)
+        if SERVER_TIMING_ENABLED:
+            total_ms = (time.perf_counter() - start_time) * 1000
+            response.headers["Server-Timing"] = format_server_timing(timings, total_ms)
+        return response
+    finally:
+        server_timing_ctx_var.reset(token)
@@ -1,8 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import configparser
 from app.config.cloudwatch_logger import setup_cloudwatch_logger
 from app.dependencies.logging_middleware import logging_dependency
+from app.dependencies.profiling_middleware import profiling_dependency
 from app.service.logic_service import logic_router
+from app.service.profiling_service import profiling_router
+
+# Read config
+config = configparser.ConfigParser()
+config.read('config.ini')
 
 service_name = "composite-service"
 logger = setup_cloudwatch_logger(service_name)
@@ -17,5 +25,14 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+# Compress only bodies large enough to be worth the CPU, e.g. full order lists
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=config.getint('compression', 'gzip_minimum_size', fallback=1000)
+)
+
 app.middleware("http")(logging_dependency)
+# Registered last so it wraps logging and can report its time in Server-Timing
+app.middleware("http")(profiling_dependency)
 app.include_router(logic_router)
+app.include_router(profiling_router)
@@ -0,0 +1,139 @@
+import asyncio
+import math
+import time
+import threading
+from collections import deque
+
+class HedgePolicy:
+    """Decides when to hedge an idempotent upstream call and keeps its metrics
+
+    The hedge delay is a percentile of recent primary attempt latencies, so
+    only requests already slower than e.g. p95 get a second copy. A token
+    bucket refilled by budget_percent of every request caps the extra load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95.0,
+        budget_percent: float = 10.0,
+        initial_delay_ms: float = 100.0,
+        min_delay_ms: float = 5.0,
+        window_size: int = 1000,
+        min_samples: int = 20,
+        max_burst: float = 10.0,
+        refresh_interval: int = 16
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.budget_ratio = budget_percent / 100
+        self.initial_delay_ms = initial_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.min_samples = min_samples
+        self.max_burst = max_burst
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window_size)
+        self._delay_ms = initial_delay_ms
+        self._stale_samples = 0
+        self._tokens = 0.0
+
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedges_suppressed = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> float:
+        """Current hedge delay in seconds"""
+        with self._lock:
+            # Re-sorting the window on every call is wasteful; refresh in batches
+            if len(self._latencies) >= self.min_samples and self._stale_samples >= self.refresh_interval:
+                ordered = sorted(self._latencies)
+                index = math.ceil(self.percentile / 100 * len(ordered)) - 1
+                self._delay_ms = max(ordered[max(index, 0)], self.min_delay_ms)
+                self._stale_samples = 0
+            return self._delay_ms / 1000
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self._tokens + self.budget_ratio, self.max_burst)
+
+    def record_latency(self, latency_ms: float):
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._stale_samples += 1
+
+    def try_acquire_hedge(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                self.hedges_suppressed += 1
+                return False
+            self._tokens -= 1
+            self.hedges_sent += 1
+            return True
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "requests": self.requests,
+                "hedges_sent": self.hedges_sent,
+                "hedges_suppressed": self.hedges_suppressed,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedges_sent / self.requests if self.requests else 0.0,
+                "hedge_win_rate": self.hedge_wins / self.hedges_sent if self.hedges_sent else 0.0,
+                "hedge_delay_ms": round(self._delay_ms, 2)
+            }
+
+def _record_primary_latency(policy: HedgePolicy, task, start_time: float):
+    # A primary cancelled because the hedge won took at least as long as it
+    # ran, so its elapsed time is kept as a censored sample. Dropping it would
+    # remove exactly the tail and pull the percentile below the target.
+    # Failed attempts say nothing about the latency distribution.
+    def callback(_):
+        if task.cancelled() or task.exception() is None:
+            policy.record_latency((time.perf_counter() - start_time) * 1000)
+    task.add_done_callback(callback)
+
+async def _cancel_all(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def hedged_request(client, policy: HedgePolicy, method: str, url: str, **kwargs):
+    """Send the request and, if it is still pending after the hedge delay,
+    an identical one; the first successful response wins and the other is cancelled
+    """
+    policy.record_request()
+    start_time = time.perf_counter()
+    primary = asyncio.ensure_future(client.request(method, url, **kwargs))
+    _record_primary_latency(policy, primary, start_time)
+
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=policy.hedge_delay())
+    except asyncio.CancelledError:
+        await _cancel_all([primary])
+        raise
+    if done or not policy.try_acquire_hedge():
+        return await primary
+
+    hedge = asyncio.ensure_future(client.request(method, url, **kwargs))
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        policy.record_hedge_win()
+                    return task.result()
+        # Both attempts failed; surface the primary's error
+        return primary.result()
+    finally:
+        await _cancel_all(pending)
@@ -6,18 +6,56 @@ from typing import Optional
 from datetime import datetime
 import json
 from app.config.aws_config import sqs_client, SQS_QUEUE_URL
-from app.config.jwt_config import get_current_user
+from app.config.jwt_config import get_current_user, require_admin
 from app.dependencies.logging_middleware import get_correlation_id
+from app.dependencies.profiling_middleware import timed, TimedRoute
+from app.service.hedging import HedgePolicy, hedged_request
+from app.service.projection import compile_projection, apply_projection
 
 # Read config
 config = configparser.ConfigParser()
 config.read('config.ini')
 
-logic_router = APIRouter(prefix='/composite')
+logic_router = APIRouter(prefix='/composite', route_class=TimedRoute)
 order_service_url = config['services']['order']
 review_service_url = config['services']['review']
+# Newer order service builds can trim responses themselves via fields=
+order_service_supports_fields = config.getboolean('services', 'order_supports_fields', fallback=False)
+
+def build_hedge_policy(name: str) -> Optional[HedgePolicy]:
+    """Hedge policy for an upstream service, or None when hedging is disabled"""
+    if not config.getboolean('hedging', 'enabled', fallback=False):
+        return None
+    return HedgePolicy(
+        name,
+        percentile=config.getfloat('hedging', 'percentile', fallback=95.0),
+        budget_percent=config.getfloat('hedging', 'budget_percent', fallback=10.0),
+        initial_delay_ms=config.getfloat('hedging', 'initial_delay_ms', fallback=100.0),
+        min_delay_ms=config.getfloat('hedging', 'min_delay_ms', fallback=5.0)
+    )
+
+order_hedge_policy = build_hedge_policy("order")
+review_hedge_policy = build_hedge_policy("review")
+
+def get_projection_plan(fields: Optional[str]) -> Optional[dict]:
+    """Compiled projection for a fields= query parameter, or None to return everything"""
+    if fields is None:
+        return None
+    try:
+        return compile_projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def order_service_params(params: dict, fields: Optional[str]) -> dict:
+    if fields is not None and order_service_supports_fields:
+        params["fields"] = fields
+    return params
+
+async def make_request(method: str, url: str, hedge_policy: Optional[HedgePolicy] = None, **kwargs):
+    # Only idempotent reads are safe to send twice
+    if method != "GET":
+        hedge_policy = None
 
-async def make_request(method: str, url: str, **kwargs):
     # Get correlation ID from context
     correlation_id = get_correlation_id()
     
@@ -29,9 +67,14 @@ async def make_request(method: str, url: str, **kwargs):
 
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.request(method, url, **kwargs)
+            with timed("upstream"):
+                if hedge_policy is not None:
+                    response = await hedged_request(client, hedge_policy, method, url, **kwargs)
+                else:
+                    response = await client.request(method, url, **kwargs)
             response.raise_for_status()
-            return response.json() if response.text else {}
+            with timed("upstream_decode"):
+                return response.json() if response.text else {}
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail=str(e))
         except httpx.RequestError as e:
@@ -49,9 +92,11 @@ def make_sync_request(method: str, url: str, **kwargs):
 
     with httpx.Client() as client:
         try:
-            response = client.request(method, url, **kwargs)
+            with timed("upstream"):
+                response = client.request(method, url, **kwargs)
             response.raise_for_status()
-            return response.json()
+            with timed("upstream_decode"):
+                return response.json()
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail=str(e))
         except httpx.RequestError as e:
@@ -110,8 +155,10 @@ async def get_orders_route(
     sport: Optional[str] = None,
     order_status: Optional[str] = None,
     skip: Optional[int] = 0,
-    limit: Optional[int] = 10
+    limit: Optional[int] = 10,
+    fields: Optional[str] = None
 ):
+    plan = get_projection_plan(fields)
     params = {
         "sport": sport,
         "order_status": order_status,
@@ -119,14 +166,27 @@ async def get_orders_route(
         "limit": limit
     }
     params = {k: v for k, v in params.items() if v is not None}
-    return await make_request("GET", f"{order_service_url}/orders/", params=params)
+    orders = await make_request(
+        "GET",
+        f"{order_service_url}/orders/",
+        params=order_service_params(params, fields)
+    )
+    return apply_projection(orders, plan)
 
 @logic_router.get("/orders/{order_id}")
 async def get_order(
-    order_id: str
+    order_id: str,
+    fields: Optional[str] = None
 ):
+    plan = get_projection_plan(fields)
     print(f"{order_service_url}orders/{order_id}")
-    return await make_request("GET", f"{order_service_url}/orders/{order_id}")
+    order = await make_request(
+        "GET",
+        f"{order_service_url}/orders/{order_id}",
+        hedge_policy=order_hedge_policy,
+        params=order_service_params({}, fields)
+    )
+    return apply_projection(order, plan)
 
 @logic_router.post('/order_stringing')
 async def create_order_stringing(
@@ -173,16 +233,17 @@ async def finish_order(
     }
     
     try:
-        response = sqs_client.send_message(
-            QueueUrl=SQS_QUEUE_URL,
-            MessageBody=json.dumps(message),
-            MessageAttributes={
-                'event_type': {
-                    'DataType': 'String',
-                    'StringValue': 'order_completed'
+        with timed("sqs"):
+            response = sqs_client.send_message(
+                QueueUrl=SQS_QUEUE_URL,
+                MessageBody=json.dumps(message),
+                MessageAttributes={
+                    'event_type': {
+                        'DataType': 'String',
+                        'StringValue': 'order_completed'
+                    }
                 }
-            }
-        )
+            )
         
         return {
             "message": "Order completion notification queued",
@@ -196,6 +257,17 @@ async def finish_order(
             detail=f"Failed to queue order completion notification: {str(e)}"
         )
 
+@logic_router.get("/hedging/metrics")
+async def get_hedging_metrics(
+    current_user: dict = Depends(require_admin)
+):
+    """Hedge rate and win metrics for each upstream service"""
+    policies = [order_hedge_policy, review_hedge_policy]
+    return {
+        "enabled": any(policies),
+        "policies": [policy.metrics() for policy in policies if policy]
+    }
+
 @logic_router.get("/available-options")
 async def get_available_options(
     # current_user: dict = Depends(get_current_user)
@@ -282,19 +354,22 @@ async def create_user_order(
 async def get_user_orders(
     user_id: str,
     skip: Optional[int] = 0,
-    limit: Optional[int] = 10
+    limit: Optional[int] = 10,
+    fields: Optional[str] = None
 ):
     """Get all orders for a specific user"""
+    plan = get_projection_plan(fields)
     params = {
         "skip": skip,
         "limit": limit
     }
     try:
-        return await make_request(
+        orders = await make_request(
             "GET",
             f"{order_service_url}/orders/user/{user_id}",
-            params=params
+            params=order_service_params(params, fields)
         )
+        return apply_projection(orders, plan)
     except Exception as e:
         print(traceback.format_exc())
         raise HTTPException(
@@ -303,13 +378,17 @@ async def get_user_orders(
         )
 
 @logic_router.get("/orders/{order_id}")
-async def get_order_details(order_id: str):
+async def get_order_details(order_id: str, fields: Optional[str] = None):
     """Get details of a specific order"""
+    plan = get_projection_plan(fields)
     try:
-        return await make_request(
+        order = await make_request(
             "GET",
-            f"{order_service_url}/orders/{order_id}"
+            f"{order_service_url}/orders/{order_id}",
+            hedge_policy=order_hedge_policy,
+            params=order_service_params({}, fields)
         )
+        return apply_projection(order, plan)
     except Exception as e:
         print(traceback.format_exc())
         raise HTTPException(
@@ -319,14 +398,18 @@ async def get_order_details(order_id: str):
 
 @logic_router.get("/reviews/order/{order_id}")
 async def get_order_reviews(
-    order_id: str
+    order_id: str,
+    fields: Optional[str] = None
 ):
     """Get all reviews for a specific order"""
+    plan = get_projection_plan(fields)
     try:
-        return await make_request(
+        reviews = await make_request(
             "GET",
-            f"{review_service_url}/reviews/target/{order_id}"
+            f"{review_service_url}/reviews/target/{order_id}",
+            hedge_policy=review_hedge_policy
         )
+        return apply_projection(reviews, plan)
     except Exception as e:
         print(traceback.format_exc())
         raise HTTPException(
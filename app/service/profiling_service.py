@@ -0,0 +1,132 @@
+import sys
+import os
+import threading
+import configparser
+from collections import Counter
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import PlainTextResponse
+from app.config.jwt_config import require_admin
+from app.dependencies.profiling_middleware import profiling_lock
+
+# Read config
+config = configparser.ConfigParser()
+config.read('config.ini')
+
+DEFAULT_SAMPLE_INTERVAL_MS = config.getfloat('profiling', 'sample_interval_ms', fallback=10.0)
+MAX_STACK_DEPTH = 128
+
+class SamplingProfiler:
+    """Periodically samples every thread's stack and counts them in folded format
+
+    While running it holds profiling_lock, so it never overlaps with an
+    X-Profile request on the same worker. The sampler thread releases the
+    lock itself when it exits, even if sampling fails.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self._samples = 0
+        self._thread = None
+        self._thread_names = {}
+        self._stop_event = threading.Event()
+        self.interval_ms = DEFAULT_SAMPLE_INTERVAL_MS
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_ms: float):
+        if self.running:
+            raise RuntimeError("Sampling profiler is already running")
+        if not profiling_lock.acquire(blocking=False):
+            raise RuntimeError("Another profiling session is already running")
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+        self.interval_ms = interval_ms
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        try:
+            self._thread.start()
+        except Exception:
+            self._thread = None
+            profiling_lock.release()
+            raise
+
+    def stop(self) -> int:
+        # A sampler thread that died on its own still has to be collected here
+        if self._thread is None:
+            raise RuntimeError("Sampling profiler is not running")
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        return self._samples
+
+    def dump(self) -> str:
+        """Return stacks as 'frame;frame;frame count' lines for flamegraph.pl / speedscope"""
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _run(self):
+        interval = self.interval_ms / 1000
+        try:
+            while not self._stop_event.wait(interval):
+                self._sample()
+        finally:
+            profiling_lock.release()
+
+    def _sample(self):
+        own_ident = threading.get_ident()
+        frames = sys._current_frames()
+        if len(self._thread_names) != threading.active_count():
+            self._thread_names = {t.ident: t.name for t in threading.enumerate()}
+        sampled = []
+        for thread_id, frame in frames.items():
+            if thread_id == own_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(self._thread_names.get(thread_id, str(thread_id)))
+            sampled.append(";".join(reversed(stack)))
+        with self._lock:
+            self._stacks.update(sampled)
+            self._samples += 1
+
+sampling_profiler = SamplingProfiler()
+
+profiling_router = APIRouter(prefix='/composite/profiler', dependencies=[Depends(require_admin)])
+
+@profiling_router.post("/start")
+async def start_profiler(interval_ms: Optional[float] = None):
+    """Start the sampling profiler; any previous samples are discarded"""
+    if interval_ms is None:
+        interval_ms = DEFAULT_SAMPLE_INTERVAL_MS
+    if interval_ms < 1:
+        raise HTTPException(status_code=400, detail="interval_ms must be at least 1")
+    try:
+        sampling_profiler.start(interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "started", "interval_ms": interval_ms}
+
+@profiling_router.post("/stop")
+async def stop_profiler():
+    """Stop the sampling profiler, keeping its samples for /stacks"""
+    try:
+        samples = sampling_profiler.stop()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "stopped", "samples": samples}
+
+@profiling_router.get("/stacks", response_class=PlainTextResponse)
+async def get_profiler_stacks():
+    """Folded stacks collected by the sampling profiler"""
+    return sampling_profiler.dump()
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Optional
+
+# Field sets come from clients, so keep the plan caches bounded
+MAX_CACHED_PLANS = 256
+
+def parse_fields(fields: str) -> frozenset:
+    """Turn 'id,status,customer.name' into a set of path tuples"""
+    paths = set()
+    for raw_path in fields.split(","):
+        raw_path = raw_path.strip()
+        if not raw_path:
+            continue
+        parts = tuple(part.strip() for part in raw_path.split("."))
+        if not all(parts):
+            raise ValueError(f"Invalid field path: '{raw_path}'")
+        paths.add(parts)
+    if not paths:
+        raise ValueError("fields must name at least one field")
+    return frozenset(paths)
+
+@lru_cache(maxsize=MAX_CACHED_PLANS)
+def _compile_plan(paths: frozenset) -> dict:
+    # A plan is a tree of selected keys; None marks a field kept as a whole
+    plan = {}
+    # Shorter paths first, so selecting 'customer' wins over 'customer.name'
+    for path in sorted(paths, key=len):
+        node = plan
+        for part in path[:-1]:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[path[-1]] = None
+    return plan
+
+@lru_cache(maxsize=MAX_CACHED_PLANS)
+def compile_projection(fields: str) -> dict:
+    """Projection plan for a fields= value, compiled once per distinct field set"""
+    return _compile_plan(parse_fields(fields))
+
+def apply_projection(data, plan: Optional[dict]):
+    """Keep only the planned fields; lists are projected item by item"""
+    if plan is None:
+        return data
+    if isinstance(data, list):
+        return [apply_projection(item, plan) for item in data]
+    if isinstance(data, dict):
+        return {
+            key: apply_projection(data[key], sub_plan)
+            for key, sub_plan in plan.items()
+            if key in data
+        }
+    return data
@@ -0,0 +1,47 @@
+import os
+import sys
+import types
+import logging
+import tempfile
+from unittest import mock
+
+# Keep the repository importable after switching to the test config directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_ROOT)
+
+# Modules read config.ini from the working directory at import time, so give
+# the unit tests their own config instead of the deployment one
+TEST_CONFIG = """
+[jwt]
+secret_key = test-secret-key-for-unit-tests-only
+algorithm = HS256
+expire_minutes = 60
+
+[services]
+order = http://order-service.test
+review = http://review-service.test
+
+[aws]
+aws_access_key_id = test
+aws_secret_access_key = test
+region = us-east-1
+sqs_queue_url = https://sqs.test/queue
+
+[openweather]
+api_key = test
+city_id = 5128581
+"""
+
+config_dir = tempfile.mkdtemp(prefix="composite-test-")
+with open(os.path.join(config_dir, "config.ini"), "w") as config_file:
+    config_file.write(TEST_CONFIG)
+os.chdir(config_dir)
+
+# app.config.aws_config creates CloudWatch and SQS clients that talk to AWS on
+# import; unit tests use an offline stand-in instead
+aws_config = types.ModuleType("app.config.aws_config")
+aws_config.cw_handler = logging.NullHandler()
+aws_config.sqs_client = mock.Mock()
+aws_config.sqs_client.send_message.return_value = {"MessageId": "test-message-id"}
+aws_config.SQS_QUEUE_URL = "https://sqs.test/queue"
+sys.modules["app.config.aws_config"] = aws_config
@@ -0,0 +1,137 @@
+import asyncio
+import random
+import time
+import httpx
+from app.service.hedging import HedgePolicy, hedged_request
+
+# Stub order service: most responses are fast, a few hit a slow tail
+FAST_MS = (1, 3)
+SLOW_MS = 120
+TAIL_PROBABILITY = 0.05
+REQUESTS = 300
+CONCURRENCY = 10
+
+def make_stub_upstream(seed=42):
+    rng = random.Random(seed)
+    stats = {"calls": 0, "cancelled": 0}
+
+    async def handler(request):
+        stats["calls"] += 1
+        if rng.random() < TAIL_PROBABILITY:
+            latency_ms = SLOW_MS
+        else:
+            latency_ms = rng.uniform(*FAST_MS)
+        try:
+            await asyncio.sleep(latency_ms / 1000)
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1]})
+
+    return httpx.MockTransport(handler), stats
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+async def run_load(policy=None):
+    transport, stats = make_stub_upstream()
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        async def one_request(i):
+            start_time = time.perf_counter()
+            url = f"http://orders.test/orders/{i}"
+            if policy is None:
+                response = await client.request("GET", url)
+            else:
+                response = await hedged_request(client, policy, "GET", url)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            assert response.json() == {"id": str(i)}
+
+        for batch_start in range(0, REQUESTS, CONCURRENCY):
+            await asyncio.gather(*(
+                one_request(i) for i in range(batch_start, batch_start + CONCURRENCY)
+            ))
+
+    return latencies, stats
+
+def test_hedging_improves_p99():
+    baseline, _ = asyncio.run(run_load())
+    policy = HedgePolicy("order", percentile=90, budget_percent=15, initial_delay_ms=20, min_delay_ms=10)
+    hedged, stats = asyncio.run(run_load(policy))
+
+    baseline_p99 = percentile(baseline, 99)
+    hedged_p99 = percentile(hedged, 99)
+    metrics = policy.metrics()
+    print(f"\nBaseline p99: {baseline_p99:.1f} ms, hedged p99: {hedged_p99:.1f} ms")
+    print("Hedging metrics:", metrics)
+
+    assert baseline_p99 >= SLOW_MS
+    assert hedged_p99 < baseline_p99 / 2
+    assert metrics["hedge_wins"] > 0
+    # Extra load stays within the configured budget
+    assert metrics["hedges_sent"] <= REQUESTS * 0.15
+    assert stats["calls"] == REQUESTS + metrics["hedges_sent"]
+    assert stats["cancelled"] > 0
+
+def test_hedge_budget_exhausted():
+    policy = HedgePolicy("order", budget_percent=0, initial_delay_ms=1)
+    latencies, stats = asyncio.run(run_load(policy))
+    metrics = policy.metrics()
+
+    assert metrics["hedges_sent"] == 0
+    assert metrics["hedges_suppressed"] > 0
+    assert stats["calls"] == REQUESTS
+
+def test_hedge_delay_tracks_configured_percentile():
+    # Stable distribution: 90% at 2-4 ms, 10% at 20-40 ms, so the true p95 is 30 ms
+    percentile_target = 95
+    true_p95_ms = 30
+    rng = random.Random(7)
+
+    async def handler(request):
+        if rng.random() < 0.1:
+            latency_ms = rng.uniform(20, 40)
+        else:
+            latency_ms = rng.uniform(2, 4)
+        await asyncio.sleep(latency_ms / 1000)
+        return httpx.Response(200, json={})
+
+    async def run():
+        # Budget well above the expected hedge rate, so only the delay limits hedging
+        policy = HedgePolicy(
+            "order", percentile=percentile_target, budget_percent=50,
+            initial_delay_ms=60, window_size=200
+        )
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            async def load(requests):
+                for batch_start in range(0, requests, CONCURRENCY):
+                    await asyncio.gather(*(
+                        hedged_request(client, policy, "GET", "http://orders.test/orders/1")
+                        for _ in range(CONCURRENCY)
+                    ))
+
+            # Warm up until the window reflects the distribution, then measure
+            await load(300)
+            warm = policy.metrics()
+            await load(600)
+            steady = policy.metrics()
+        return warm, steady
+
+    warm, steady = asyncio.run(run())
+    hedge_rate = (
+        (steady["hedges_sent"] - warm["hedges_sent"])
+        / (steady["requests"] - warm["requests"])
+    )
+    print(f"\nSteady state: hedge_delay_ms={steady['hedge_delay_ms']}, hedge_rate={hedge_rate:.3f}")
+
+    assert 0.8 * true_p95_ms <= steady["hedge_delay_ms"] <= 1.5 * true_p95_ms
+    # Roughly (100 - percentile)% of requests outlive the delay and get hedged
+    assert 0.02 <= hedge_rate <= 0.08
+
+def test_hedging_disabled_without_config():
+    from app.service import logic_service
+
+    assert logic_service.order_hedge_policy is None
+    assert logic_service.review_hedge_policy is None
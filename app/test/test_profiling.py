@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import FastAPI, APIRouter
+from fastapi.testclient import TestClient
+from app.config.jwt_config import create_access_token
+from app.dependencies import profiling_middleware
+from app.dependencies.profiling_middleware import (
+    profiling_dependency, timed, format_server_timing, server_timing_ctx_var,
+    profiling_lock, TimedRoute
+)
+from app.service.profiling_service import SamplingProfiler, profiling_router
+
+ADMIN_TOKEN = create_access_token({"user_id": 1, "email": "admin@example.com", "role": "admin"})
+USER_TOKEN = create_access_token({"user_id": 2, "email": "user@example.com", "role": "customer"})
+
+def make_app():
+    app = FastAPI()
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/orders/{order_id}")
+    async def get_order(order_id: str):
+        with timed("upstream"):
+            await asyncio.sleep(0.01)
+        return {"id": order_id}
+
+    @router.get("/orders")
+    async def get_orders(count: int = 3000):
+        with timed("upstream"):
+            await asyncio.sleep(0.01)
+            orders = [
+                {
+                    "id": str(i),
+                    "order_status": "pending",
+                    "notes": "Please string at 55 lbs",
+                    "price": 20.0,
+                    "customer": {"name": "Alex", "email": "alex@example.com", "tags": ["vip", "tennis"]}
+                }
+                for i in range(count)
+            ]
+        return orders
+
+    @router.get("/orders/sync/{order_id}")
+    def get_order_sync(order_id: str):
+        return {"id": order_id}
+
+    app.include_router(router)
+    app.middleware("http")(profiling_dependency)
+    app.include_router(profiling_router)
+    return app
+
+def parse_server_timing(header):
+    phases = {}
+    for entry in header.split(", "):
+        name, _, duration = entry.partition(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def test_timed_accumulates_per_phase():
+    timings = {}
+    server_timing_ctx_var.set(timings)
+    try:
+        with timed("upstream"):
+            time.sleep(0.005)
+        with timed("upstream"):
+            time.sleep(0.005)
+    finally:
+        server_timing_ctx_var.set(None)
+
+    assert timings["upstream"] >= 10
+    # Outside a request nothing is recorded and nothing fails
+    with timed("upstream"):
+        pass
+
+def test_format_server_timing():
+    header = format_server_timing({"upstream": 12.345, "logging": 0.5}, 20)
+    assert header == (
+        "upstream;dur=12.35, upstream_decode;dur=0.00, serialization;dur=0.00, "
+        "logging;dur=0.50, sqs;dur=0.00, total;dur=20.00"
+    )
+
+def test_server_timing_hidden_unless_enabled(monkeypatch):
+    client = TestClient(make_app())
+    assert "server-timing" not in client.get("/orders/1").headers
+
+    monkeypatch.setattr(profiling_middleware, "SERVER_TIMING_ENABLED", True)
+    header = client.get("/orders/1").headers["server-timing"]
+    assert header.startswith("upstream;dur=")
+    assert "serialization;dur=" in header
+
+def test_serialization_phase_covers_encoding(monkeypatch):
+    monkeypatch.setattr(profiling_middleware, "SERVER_TIMING_ENABLED", True)
+    client = TestClient(make_app())
+    client.get("/orders", params={"count": 10})
+
+    response = client.get("/orders")
+    assert len(response.json()) == 3000
+    phases = parse_server_timing(response.headers["server-timing"])
+    print("\nServer-Timing:", phases)
+    accounted = sum(duration for name, duration in phases.items() if name != "total")
+
+    # jsonable_encoder dominates a large payload and must land in a phase
+    assert phases["serialization"] > phases["upstream"]
+    assert accounted >= 0.8 * phases["total"]
+
+def test_serialization_phase_for_sync_routes(monkeypatch):
+    monkeypatch.setattr(profiling_middleware, "SERVER_TIMING_ENABLED", True)
+    client = TestClient(make_app())
+    response = client.get("/orders/sync/7")
+    assert response.json() == {"id": "7"}
+    assert parse_server_timing(response.headers["server-timing"])["serialization"] > 0
+
+@pytest.mark.parametrize("headers", [
+    {},
+    auth(USER_TOKEN),
+    {"Authorization": "Bearer not-a-jwt"},
+])
+def test_profile_header_ignored_without_admin(headers):
+    client = TestClient(make_app())
+    response = client.get("/orders/1", headers={"X-Profile": "1", **headers})
+    assert response.status_code == 200
+    assert response.json() == {"id": "1"}
+    assert "x-profiled-status" not in response.headers
+    assert "server-timing" not in response.headers
+
+def test_profile_returned_to_admin():
+    client = TestClient(make_app())
+    response = client.get("/orders/1", headers={"X-Profile": "1", **auth(ADMIN_TOKEN)})
+
+    assert response.status_code == 200
+    assert response.headers["x-profiled-status"] == "200"
+    assert "server-timing" in response.headers
+    assert "function calls" in response.text
+    assert not profiling_lock.locked()
+
+def test_concurrent_profiles_rejected():
+    client = TestClient(make_app())
+    with profiling_lock:
+        response = client.get("/orders/1", headers={"X-Profile": "1", **auth(ADMIN_TOKEN)})
+    assert response.status_code == 409
+
+def test_sampler_folded_stacks():
+    profiler = SamplingProfiler()
+    stop_worker = threading.Event()
+
+    def busy_worker():
+        while not stop_worker.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_worker, name="busy-worker")
+    worker.start()
+    try:
+        profiler.start(interval_ms=1)
+        time.sleep(0.1)
+        samples = profiler.stop()
+    finally:
+        stop_worker.set()
+        worker.join()
+
+    assert samples > 0
+    assert not profiling_lock.locked()
+    lines = profiler.dump().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+    assert any(
+        line.startswith("busy-worker;") and "busy_worker (test_profiling.py:" in line
+        for line in lines
+    )
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_sampler_failure_releases_lock():
+    profiler = SamplingProfiler()
+
+    def broken_sample():
+        raise RuntimeError("sampling failed")
+
+    profiler._sample = broken_sample
+    profiler.start(interval_ms=1)
+    profiler._thread.join(timeout=1)
+
+    assert not profiling_lock.locked()
+    assert profiler.stop() == 0
+    with pytest.raises(RuntimeError):
+        profiler.stop()
+
+def test_sampler_excludes_request_profiling():
+    profiler = SamplingProfiler()
+    profiler.start(interval_ms=5)
+    try:
+        client = TestClient(make_app())
+        response = client.get("/orders/1", headers={"X-Profile": "1", **auth(ADMIN_TOKEN)})
+        assert response.status_code == 409
+    finally:
+        profiler.stop()
+
+    with profiling_lock:
+        with pytest.raises(RuntimeError):
+            profiler.start(interval_ms=5)
+
+def test_profiler_endpoints():
+    client = TestClient(make_app())
+    assert client.post("/composite/profiler/start", headers=auth(USER_TOKEN)).status_code == 403
+
+    response = client.post("/composite/profiler/start?interval_ms=0", headers=auth(ADMIN_TOKEN))
+    assert response.status_code == 400
+
+    assert client.post("/composite/profiler/start?interval_ms=2", headers=auth(ADMIN_TOKEN)).json() == {
+        "status": "started", "interval_ms": 2.0
+    }
+    assert client.post("/composite/profiler/start", headers=auth(ADMIN_TOKEN)).status_code == 409
+    time.sleep(0.02)
+    assert client.post("/composite/profiler/stop", headers=auth(ADMIN_TOKEN)).json()["status"] == "stopped"
+    assert client.post("/composite/profiler/stop", headers=auth(ADMIN_TOKEN)).status_code == 409
+
+    response = client.get("/composite/profiler/stacks", headers=auth(ADMIN_TOKEN))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text
@@ -0,0 +1,100 @@
+import pytest
+from app.service.projection import compile_projection, apply_projection
+
+ORDERS = [
+    {
+        "id": "565c7269",
+        "order_status": "pending",
+        "notes": "Please string at 55 lbs",
+        "price": 20.0,
+        "customer": {"name": "Alex", "email": "alex@example.com"}
+    },
+    {
+        "id": "fefc7837",
+        "order_status": "completed",
+        "notes": "",
+        "price": 25.0
+    }
+]
+
+def test_projects_top_level_and_nested_fields():
+    plan = compile_projection("id, order_status,customer.name")
+    assert apply_projection(ORDERS, plan) == [
+        {"id": "565c7269", "order_status": "pending", "customer": {"name": "Alex"}},
+        {"id": "fefc7837", "order_status": "completed"}
+    ]
+
+def test_whole_field_wins_over_nested_selection():
+    plan = compile_projection("customer.name,customer")
+    assert apply_projection(ORDERS[0], plan) == {"customer": ORDERS[0]["customer"]}
+
+def test_plans_are_cached_per_field_set():
+    assert compile_projection("id,price") is compile_projection("id,price")
+    assert compile_projection("id,price") is compile_projection("price, id")
+
+def test_no_fields_returns_everything():
+    assert apply_projection(ORDERS, None) is ORDERS
+
+@pytest.mark.parametrize("fields", ["", " , ", "customer..name", "id,.price"])
+def test_invalid_fields_rejected(fields):
+    with pytest.raises(ValueError):
+        compile_projection(fields)
+
+@pytest.fixture
+def order_service(monkeypatch):
+    """Route the composite service's upstream calls to a stub order service"""
+    import httpx
+    from app.service import logic_service
+
+    upstream_requests = []
+    orders = [dict(ORDERS[0], id=str(i), notes="x" * 100) for i in range(50)]
+
+    def handler(request):
+        upstream_requests.append(request)
+        return httpx.Response(200, json=orders)
+
+    transport = httpx.MockTransport(handler)
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        logic_service.httpx, "AsyncClient",
+        lambda **kwargs: async_client(transport=transport, **kwargs)
+    )
+    return upstream_requests
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+def test_route_projects_orders(order_service, client):
+    response = client.get("/composite/orders", params={"fields": "id,customer.name"})
+    assert response.status_code == 200
+    assert response.json()[0] == {"id": "0", "customer": {"name": "Alex"}}
+
+def test_route_rejects_malformed_fields(order_service, client):
+    response = client.get("/composite/orders/user/42", params={"fields": "customer..name"})
+    assert response.status_code == 400
+    assert "Invalid field path" in response.json()["detail"]
+    assert order_service == []
+
+@pytest.mark.parametrize("supported", [False, True])
+def test_fields_forwarded_only_when_supported(order_service, client, monkeypatch, supported):
+    from app.service import logic_service
+
+    monkeypatch.setattr(logic_service, "order_service_supports_fields", supported)
+    client.get("/composite/orders", params={"fields": "id", "limit": 5})
+
+    upstream_params = order_service[0].url.params
+    assert upstream_params["limit"] == "5"
+    assert upstream_params.get("fields") == ("id" if supported else None)
+
+def test_gzip_only_above_minimum_size(order_service, client):
+    full = client.get("/composite/orders")
+    assert len(full.content) > 1000
+    assert full.headers["content-encoding"] == "gzip"
+
+    projected = client.get("/composite/orders", params={"fields": "id"})
+    assert len(projected.content) < 1000
+    assert "content-encoding" not in projected.headers